@@ -1,4 +1,5 @@
 import json
+from profiler import profiled_stage
 
 def load_taxonomy():
     """Load and flatten taxonomy for validation"""
@@ -16,6 +17,11 @@ def load_taxonomy():
 
 TAXONOMY, FLAT_TAXONOMY = load_taxonomy()
 
+# Bump whenever a rule or weight in decide_subgenre changes, so stored
+# results are re-adjudicated on the next reclassify
+RULES_VERSION = "1"
+
+@profiled_stage("decide_subgenre")
 def decide_subgenre(signals, story, tags):
     """Map signals to taxonomy subgenre with reasoning"""
     
@@ -1,11 +1,20 @@
 # extractor.py
 import json
 import requests
+from profiler import profiled_stage, stage
 
 # OPTION 1: Groq (FREE, FAST, RELIABLE)
 # Get free API key at: https://console.groq.com/
 # 14,400 requests/day free tier
 
+MODELS = {
+    "groq": "llama-3.3-70b-versatile",
+    "together": "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo"
+}
+
+# Reported as the signal source when heuristic_fallback produced the signals
+HEURISTIC_SOURCE = "heuristic"
+
 def build_prompt(story, tags):
     """Simple, focused prompt for better JSON output"""
     return f"""Extract story signals as JSON only. No explanation.
@@ -30,47 +39,52 @@ Return this exact format:
 def call_groq_api(api_key, prompt):
     """Call Groq API - FREE and reliable"""
     try:
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "llama-3.3-70b-versatile",  # Fast and accurate
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1,
-                "max_tokens": 500
-            },
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
+        with stage("request"):
+            response = requests.post(
+                "https://api.groq.com/openai/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": MODELS["groq"],  # Fast and accurate
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.1,
+                    "max_tokens": 500
+                },
+                timeout=10
+            )
+            response.raise_for_status()
+        with stage("json_parse"):
+            return response.json()["choices"][0]["message"]["content"]
     except Exception as e:
         raise Exception(f"Groq API error: {str(e)}")
 
 def call_together_api(api_key, prompt):
     """Alternative: Together AI - also FREE"""
     try:
-        response = requests.post(
-            "https://api.together.xyz/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1,
-                "max_tokens": 500
-            },
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
+        with stage("request"):
+            response = requests.post(
+                "https://api.together.xyz/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": MODELS["together"],
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.1,
+                    "max_tokens": 500
+                },
+                timeout=10
+            )
+            response.raise_for_status()
+        with stage("json_parse"):
+            return response.json()["choices"][0]["message"]["content"]
     except Exception as e:
         raise Exception(f"Together API error: {str(e)}")
 
+@profiled_stage("heuristic_fallback")
 def heuristic_fallback(story, tags):
     """Robust fallback using pattern matching"""
     text = story.lower()
@@ -162,8 +176,13 @@ def heuristic_fallback(story, tags):
         "tone": "scary" if "scary" in tag_str else "melancholic" if "sad" in tag_str else "tense" if thriller != "none" else "romantic" if relationship != "none" else "instructional"
     }
 
-def extract_signals(api_key, story, tags, api_type="groq"):
-    """Extract semantic signals using free LLM API"""
+@profiled_stage("extract_signals")
+def extract_signals(api_key, story, tags, api_type="groq", with_source=False):
+    """Extract semantic signals using free LLM API.
+
+    With with_source=True returns (signals, source), where source is the
+    model name or HEURISTIC_SOURCE if the fallback produced the signals.
+    """
     prompt = build_prompt(story, tags)
     
     try:
@@ -176,14 +195,15 @@ def extract_signals(api_key, story, tags, api_type="groq"):
             raise ValueError(f"Unknown API type: {api_type}")
         
         # Extract JSON from response
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        
-        if start == -1 or end == 0:
-            raise ValueError("No JSON found")
-        
-        json_str = text[start:end]
-        signals = json.loads(json_str)
+        with stage("json_parse"):
+            start = text.find("{")
+            end = text.rfind("}") + 1
+            
+            if start == -1 or end == 0:
+                raise ValueError("No JSON found")
+            
+            json_str = text[start:end]
+            signals = json.loads(json_str)
         
         # Validate required fields
         required = ["primary_theme", "relationship_dynamic", "thriller_type", 
@@ -192,8 +212,9 @@ def extract_signals(api_key, story, tags, api_type="groq"):
             raise ValueError("Missing required fields")
         
         print("✓ LLM extraction successful")
-        return signals
+        return (signals, MODELS[api_type]) if with_source else signals
         
     except Exception as e:
         print(f"⚠️ LLM failed ({str(e)}), using heuristic fallback")
-        return heuristic_fallback(story, tags)
\ No newline at end of file
+        signals = heuristic_fallback(story, tags)
+        return (signals, HEURISTIC_SOURCE) if with_source else signals
\ No newline at end of file
@@ -4,6 +4,8 @@ import os
 from datetime import datetime
 from extractor import extract_signals
 from adjudicator import decide_subgenre, load_taxonomy
+from reclassifier import compute_fingerprints, current_versions, plan_reclassification, reclassify, validate_results
+from profiler import PROFILE_ENABLED, maybe_profile
 
 # Page config
 st.set_page_config(
@@ -19,6 +21,18 @@ if 'session_id' not in st.session_state:
     st.session_state.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
 if 'api_configured' not in st.session_state:
     st.session_state.api_configured = False
+if 'upload_key' not in st.session_state:
+    st.session_state.upload_key = 0
+
+def show_profile(profile):
+    """Render a finished profile's per-stage table and output files"""
+    with st.expander("Profile", expanded=True):
+        st.write(f"**Wall time:** {profile.elapsed * 1000:.1f} ms")
+        st.table(profile.summary())
+        if profile.write_error:
+            st.warning(f"Could not write profile files: {profile.write_error}")
+        else:
+            st.caption("Written: " + ", ".join(profile.files))
 
 # Custom CSS
 st.markdown("""
@@ -88,6 +102,14 @@ with st.sidebar:
     
     st.divider()
     
+    profile_runs = st.checkbox(
+        "Profile runs",
+        value=PROFILE_ENABLED,
+        help="Record per-stage timings and a flame graph (collapsed stacks) for 'Map to Taxonomy', 'Reclassify Changed' and 'Run All Test Cases'. Set TAXONOMY_PROFILE=1 to tick this by default."
+    )
+    
+    st.divider()
+    
     if st.button("Start New Session", type="primary"):
         st.session_state.results = []
         st.session_state.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -143,11 +165,12 @@ with tab1:
                 tags = [tag.strip() for tag in tags_input.split(",")] if tags_input else []
                 
                 try:
-                    # Extract signals
-                    signals = extract_signals(api_key, story_input, tags, api_type="groq")
-                    
-                    # Decide subgenre
-                    decision = decide_subgenre(signals, story_input, tags)
+                    with maybe_profile("map_story", enabled=profile_runs) as profile:
+                        # Extract signals
+                        signals, source = extract_signals(api_key, story_input, tags, api_type="groq", with_source=True)
+                        
+                        # Decide subgenre
+                        decision = decide_subgenre(signals, story_input, tags)
                     
                     # Store result
                     result = {
@@ -156,7 +179,8 @@ with tab1:
                         "story": story_input,
                         "tags": tags,
                         "signals": signals,
-                        "decision": decision
+                        "decision": decision,
+                        "fingerprints": compute_fingerprints(story_input, tags, source)
                     }
                     st.session_state.results.append(result)
                     
@@ -196,6 +220,10 @@ with tab1:
                     
                     st.markdown('</div>', unsafe_allow_html=True)
                     
+                    # Profile
+                    if profile:
+                        show_profile(profile)
+                    
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
 
@@ -203,9 +231,62 @@ with tab1:
 with tab2:
     st.header("Session Results")
     
+    # Load previously downloaded results so they can be reclassified
+    uploaded_results = st.file_uploader(
+        "Load Results (JSON)",
+        type="json",
+        key=f"results_upload_{st.session_state.upload_key}"
+    )
+    if uploaded_results is not None and st.button("Add Loaded Results to Session"):
+        try:
+            loaded = json.load(uploaded_results)
+            validate_results(loaded)
+        except Exception as e:
+            st.error(f"Could not load results: {str(e)}")
+        else:
+            for result in loaded:
+                result["id"] = len(st.session_state.results) + 1
+                st.session_state.results.append(result)
+            # A fresh widget key clears the uploader so the file can't be added twice
+            st.session_state.upload_key += 1
+            st.rerun()
+    
     if not st.session_state.results:
         st.info("No results yet. Map some stories in the 'Map Story' tab!")
     else:
+        # Reclassify before the stats and download below, so both reflect the updated results
+        reclassify_button = st.button(
+            "Reclassify Changed",
+            help="Re-run only the stage whose inputs changed (prompt/model -> extraction, rules/taxonomy -> adjudication)"
+        )
+        
+        if reclassify_button:
+            # Adjudication-only and unchanged results need no API key
+            stages = {"extract": 0, "adjudicate": 0, "skip": 0}
+            needs_key = 0
+            versions = current_versions(api_type="groq")
+            with st.spinner("Reclassifying results..."), maybe_profile("reclassify", enabled=profile_runs) as profile:
+                for i, result in enumerate(st.session_state.results):
+                    try:
+                        stage = plan_reclassification(result, api_type="groq", versions=versions)
+                        if stage == "extract" and not st.session_state.api_configured:
+                            needs_key += 1
+                            continue
+                        updated, stage = reclassify(api_key, result, api_type="groq", stage=stage, versions=versions)
+                        st.session_state.results[i] = updated
+                        stages[stage] += 1
+                    except Exception as e:
+                        st.error(f"Error reclassifying result #{result['id']}: {str(e)}")
+            st.success(
+                f"Re-extracted: {stages['extract']} | "
+                f"Re-adjudicated: {stages['adjudicate']} | "
+                f"Unchanged: {stages['skip']}"
+            )
+            if needs_key:
+                st.warning(f"{needs_key} result(s) need re-extraction. Configure the API key in the sidebar to update them.")
+            if profile:
+                show_profile(profile)
+        
         # Stats
         col1, col2, col3 = st.columns(3)
         
@@ -312,30 +393,33 @@ with tab3:
                 
                 test_results = []
                 
-                for i, case in enumerate(test_cases):
-                    status_text.text(f"Processing case {i+1}/{len(test_cases)}...")
-                    
-                    try:
-                        signals = extract_signals(api_key, case['story'], case['tags'], api_type="groq")
+                with maybe_profile("test_cases", enabled=profile_runs) as profile:
+                    for i, case in enumerate(test_cases):
+                        status_text.text(f"Processing case {i+1}/{len(test_cases)}...")
                         
-                        decision = decide_subgenre(signals, case['story'], case['tags'])
+                        try:
+                            signals = extract_signals(api_key, case['story'], case['tags'], api_type="groq")
+                            
+                            decision = decide_subgenre(signals, case['story'], case['tags'])
+                            
+                            test_results.append({
+                                "id": case['id'],
+                                "tags": case['tags'],
+                                "story": case['story'],
+                                "expected": case['expected'],
+                                "actual": decision['subgenre'],
+                                "signals": signals,
+                                "decision": decision,
+                                "match": decision['subgenre'].lower() in case['expected'].lower() or case['expected'].lower() in decision['subgenre'].lower()
+                            })
+                        except Exception as e:
+                            st.error(f"Error processing case {case['id']}: {str(e)}")
                         
-                        test_results.append({
-                            "id": case['id'],
-                            "tags": case['tags'],
-                            "story": case['story'],
-                            "expected": case['expected'],
-                            "actual": decision['subgenre'],
-                            "signals": signals,
-                            "decision": decision,
-                            "match": decision['subgenre'].lower() in case['expected'].lower() or case['expected'].lower() in decision['subgenre'].lower()
-                        })
-                    except Exception as e:
-                        st.error(f"Error processing case {case['id']}: {str(e)}")
-                    
-                    progress_bar.progress((i + 1) / len(test_cases))
+                        progress_bar.progress((i + 1) / len(test_cases))
                 
                 status_text.text("All test cases completed")
+                if profile:
+                    show_profile(profile)
                 
                 # Show results
                 st.divider()
@@ -0,0 +1,174 @@
+# profiler.py
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Opt-in: set TAXONOMY_PROFILE=1 to profile every run, or use the toggle in main.py
+PROFILE_ENABLED = os.environ.get("TAXONOMY_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.environ.get("TAXONOMY_PROFILE_DIR", "profiles")
+SAMPLE_INTERVAL = float(os.environ.get("TAXONOMY_PROFILE_INTERVAL", "0.001"))
+
+# Streamlit runs each browser session in its own thread, so the open
+# profiles are tracked per thread: stages on other threads never leak in.
+# Profiles can nest; a stage is recorded into every open profile.
+_local = threading.local()
+
+# The GIL switch interval is process-wide; lower it while any profile is
+# running and restore it when the last one finishes
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_saved = None
+
+def _open_profiles():
+    if not hasattr(_local, "profiles"):
+        _local.profiles = []
+    return _local.profiles
+
+def _lower_switch_interval(interval):
+    global _switch_users, _switch_saved
+    with _switch_lock:
+        if _switch_users == 0:
+            _switch_saved = sys.getswitchinterval()
+            # Let the sampler thread grab the GIL as often as it wants to sample
+            sys.setswitchinterval(min(_switch_saved, interval))
+        _switch_users += 1
+
+def _restore_switch_interval():
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_switch_saved)
+
+class Profile:
+    """Profiles one pipeline run: per-stage timings plus sampled stacks tagged with stage names"""
+
+    def __init__(self, label="run", interval=SAMPLE_INTERVAL, output_dir=PROFILE_DIR):
+        self.label = label
+        self.interval = interval
+        self.output_dir = output_dir
+        self.stages = ()
+        self.timings = defaultdict(lambda: {"calls": 0, "total": 0.0})
+        self.samples = Counter()
+        self.elapsed = 0.0
+        self.files = []
+        self.write_error = None
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._root = sys._getframe(1)
+        _lower_switch_interval(self.interval)
+        self._start = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+        _open_profiles().append(self)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._sampler.join()
+        self.elapsed = time.perf_counter() - self._start
+        _restore_switch_interval()
+        _open_profiles().remove(self)
+
+        # A read-only disk must not turn a successful run into an error;
+        # the in-memory summary is still available
+        try:
+            self.files = self.write()
+        except OSError as e:
+            self.write_error = str(e)
+        return False
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+
+            # Walk up to (but not past) the frame that started the run
+            frames = []
+            while frame is not None and frame is not self._root:
+                code = frame.f_code
+                if code.co_filename != __file__:
+                    frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            frames.reverse()
+
+            tags = [f"[{name}]" for name in self.stages] or ["[untagged]"]
+            self.samples[";".join(tags + frames)] += 1
+
+    def summary(self):
+        """Rows of stage, calls, total ms, mean ms and share of the run, slowest first"""
+        rows = []
+        for name, t in sorted(self.timings.items(), key=lambda x: x[1]["total"], reverse=True):
+            rows.append({
+                "stage": name,
+                "calls": t["calls"],
+                "total_ms": round(t["total"] * 1000, 3),
+                "mean_ms": round(t["total"] * 1000 / t["calls"], 3),
+                "share": f"{t['total'] / self.elapsed * 100:.1f}%" if self.elapsed else "-"
+            })
+        return rows
+
+    def write(self):
+        """Write collapsed stacks (for flamegraph.pl / speedscope) and a summary table"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.label}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+
+        collapsed_path = base + ".collapsed"
+        with open(collapsed_path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        summary_path = base + "_summary.txt"
+        with open(summary_path, "w") as f:
+            f.write(f"Run: {self.label} | wall time {self.elapsed * 1000:.3f} ms | {sum(self.samples.values())} samples\n\n")
+            f.write(f"{'stage':<24}{'calls':>8}{'total_ms':>14}{'mean_ms':>14}{'share':>10}\n")
+            for row in self.summary():
+                f.write(f"{row['stage']:<24}{row['calls']:>8}{row['total_ms']:>14.3f}{row['mean_ms']:>14.3f}{row['share']:>10}\n")
+
+        return [collapsed_path, summary_path]
+
+@contextmanager
+def stage(name):
+    """Tag the enclosed code with a stage name (no-op when no profile is active)"""
+    profiles = list(_open_profiles())
+    if not profiles:
+        yield
+        return
+
+    previous = [profile.stages for profile in profiles]
+    for profile in profiles:
+        profile.stages = profile.stages + (name,)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for profile, stages in zip(profiles, previous):
+            t = profile.timings[name]
+            t["calls"] += 1
+            t["total"] += elapsed
+            profile.stages = stages
+
+def profiled_stage(name):
+    """Decorator form of stage() for pipeline entry points"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _open_profiles():
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def maybe_profile(label, enabled=PROFILE_ENABLED):
+    """Profile(label) when profiling is enabled, otherwise a no-op context"""
+    return Profile(label) if enabled else nullcontext()
@@ -0,0 +1,107 @@
+# reclassifier.py
+import hashlib
+import json
+from extractor import MODELS, build_prompt, extract_signals
+from adjudicator import RULES_VERSION, TAXONOMY, decide_subgenre
+
+RESULT_KEYS = ["timestamp", "story", "tags", "signals", "decision"]
+DECISION_KEYS = ["subgenre", "parent", "reasoning"]
+
+def _digest(value):
+    """Short stable hash of any JSON-serialisable value"""
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def prompt_version():
+    """Hash of the prompt template (placeholders instead of real story/tags)"""
+    return _digest(build_prompt("{story}", "{tags}"))
+
+def rules_version():
+    """Hash of the taxonomy plus the declared adjudicator rules version"""
+    return _digest({"taxonomy": TAXONOMY, "rules": RULES_VERSION})
+
+def current_versions(api_type="groq"):
+    """Prompt, model and rules fingerprints of the current code, computed once per pass"""
+    return {
+        "prompt": prompt_version(),
+        "model": MODELS.get(api_type, api_type),
+        "rules": rules_version()
+    }
+
+def compute_fingerprints(story, tags, source, versions=None):
+    """Fingerprints of every input that went into a stored result.
+
+    source is what produced the signals: a model name, or HEURISTIC_SOURCE
+    when extract_signals fell back to the heuristic.
+    """
+    versions = versions or current_versions()
+    return {
+        "story": _digest(story),
+        "tags": _digest(tags),
+        "prompt": versions["prompt"],
+        "model": source,
+        "rules": versions["rules"]
+    }
+
+def validate_results(results):
+    """Raise ValueError unless results looks like a downloaded results file"""
+    if not isinstance(results, list):
+        raise ValueError("expected a list of results")
+    for i, result in enumerate(results):
+        if not isinstance(result, dict):
+            raise ValueError(f"entry {i + 1} is not an object")
+        missing = [k for k in RESULT_KEYS if k not in result]
+        if isinstance(result.get("decision"), dict):
+            missing += [f"decision.{k}" for k in DECISION_KEYS if k not in result["decision"]]
+        if missing:
+            raise ValueError(f"entry {i + 1} is missing {', '.join(missing)}")
+        if not isinstance(result["decision"], dict) or not isinstance(result["signals"], dict):
+            raise ValueError(f"entry {i + 1} has a malformed decision or signals")
+        if not isinstance(result["tags"], list):
+            raise ValueError(f"entry {i + 1} has non-list tags")
+        if not isinstance(result.get("fingerprints", {}), dict):
+            raise ValueError(f"entry {i + 1} has malformed fingerprints")
+
+def plan_reclassification(result, api_type="groq", versions=None):
+    """Decide which stage a stored result needs: 'extract', 'adjudicate' or 'skip'"""
+    stored = result.get("fingerprints")
+    if not isinstance(stored, dict) or not stored or "signals" not in result:
+        return "extract"
+
+    versions = versions or current_versions(api_type)
+    current = compute_fingerprints(result["story"], result["tags"], versions["model"], versions)
+
+    # The story/tags hashes only differ when a downloaded results file was
+    # edited (e.g. a corrected story) before being loaded back in.
+    # Heuristic results never match the current model, so they are always retried.
+    if any(stored.get(k) != current[k] for k in ["story", "tags", "prompt", "model"]):
+        return "extract"
+
+    # Only the rules/taxonomy changed -> stored signals can be reused
+    if stored.get("rules") != current["rules"]:
+        return "adjudicate"
+
+    return "skip"
+
+def reclassify(api_key, result, api_type="groq", stage=None, versions=None):
+    """Re-run only the stale stage of a stored result. Returns (result, stage).
+
+    Pass a stage already returned by plan_reclassification, and the pass's
+    current_versions(), to avoid recomputing them for every result.
+    """
+    versions = versions or current_versions(api_type)
+    stage = stage or plan_reclassification(result, api_type, versions)
+    if stage == "skip":
+        return result, stage
+
+    updated = dict(result)
+    if stage == "extract":
+        updated["signals"], source = extract_signals(
+            api_key, result["story"], result["tags"], api_type=api_type, with_source=True
+        )
+        updated["fingerprints"] = compute_fingerprints(result["story"], result["tags"], source, versions)
+    else:
+        updated["fingerprints"] = dict(result["fingerprints"], rules=versions["rules"])
+
+    updated["decision"] = decide_subgenre(updated["signals"], result["story"], result["tags"])
+    return updated, stage